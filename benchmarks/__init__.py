@@ -0,0 +1,6 @@
+"""
+Benchmark and load-test suite for the Python tools (mfkn_search_tool,
+openwebui_tool).
+
+See benchmarks/README.md for usage.
+"""
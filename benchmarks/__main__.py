@@ -0,0 +1,121 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks run --output bench_results.json
+    python -m benchmarks compare old.json new.json
+
+Run from the repository root so the tool modules are importable.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .compare import compare_results, format_comparison
+from .load import TARGETS, run_load
+from .micro import run_micro
+from .stub_server import StubServer
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _cmd_run(args) -> int:
+    result = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stub": {
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "error_rate": args.error_rate,
+                "seed": args.seed,
+            },
+        },
+    }
+
+    if not args.skip_micro:
+        print("Kører micro-benchmarks ...", file=sys.stderr)
+        result["micro"] = run_micro(number=args.number, repeat=args.repeat)
+
+    if not args.skip_load:
+        print("Kører load-tests mod stub-server ...", file=sys.stderr)
+        with StubServer(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        ) as server:
+            result["load"] = run_load(
+                server.url,
+                concurrency_levels=args.concurrency,
+                requests_per_level=args.requests,
+                targets=args.targets,
+            )
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(text)
+    else:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(f"Resultater skrevet til {args.output}", file=sys.stderr)
+    return 0
+
+
+def _cmd_compare(args) -> int:
+    old = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.candidate).read_text(encoding="utf-8"))
+    rows = compare_results(old, new, threshold=args.threshold)
+    print(format_comparison(rows))
+    regressions = [r for r in rows if r["regression"]]
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Kør micro-benchmarks og load-tests")
+    run.add_argument("--output", default="bench_results.json", help="JSON-fil eller '-' for stdout")
+    run.add_argument("--number", type=int, default=200, help="Kald per repeat (micro)")
+    run.add_argument("--repeat", type=int, default=5, help="Antal repeats (micro)")
+    run.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    run.add_argument("--requests", type=int, default=200, help="Kald per concurrency-niveau")
+    run.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    run.add_argument("--latency-ms", type=float, default=20.0)
+    run.add_argument("--jitter-ms", type=float, default=10.0)
+    run.add_argument("--error-rate", type=float, default=0.0)
+    run.add_argument("--seed", type=int, default=1234)
+    run.add_argument("--skip-micro", action="store_true")
+    run.add_argument("--skip-load", action="store_true")
+    run.set_defaults(func=_cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Sammenlign to resultatfiler")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("candidate")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="Relativ ændring der regnes som regression")
+    cmp_.add_argument("--fail-on-regression", action="store_true")
+    cmp_.set_defaults(func=_cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
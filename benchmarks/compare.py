@@ -0,0 +1,57 @@
+"""
+Compare two benchmark result files produced by ``python -m benchmarks run``.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+# Metrikker hvor lavere er bedre; throughput er den eneste "højere er bedre"
+LOWER_IS_BETTER = {"min_us", "median_us", "mean_us", "p50_ms", "p90_ms", "p99_ms"}
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+def _flatten(result: dict) -> Iterator[Tuple[str, str, float]]:
+    for name, stats in (result.get("micro") or {}).items():
+        for metric, value in stats.items():
+            yield f"micro.{name}", metric, value
+    for target, levels in (result.get("load") or {}).items():
+        for level, stats in levels.items():
+            for metric, value in stats.items():
+                yield f"load.{target}.{level}", metric, value
+
+
+def compare_results(old: dict, new: dict, threshold: float = 0.10) -> List[Dict]:
+    old_index = {(case, metric): v for case, metric, v in _flatten(old)}
+    rows: List[Dict] = []
+    for case, metric, new_value in _flatten(new):
+        if metric not in LOWER_IS_BETTER | HIGHER_IS_BETTER:
+            continue
+        old_value = old_index.get((case, metric))
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        worse = change if metric in LOWER_IS_BETTER else -change
+        rows.append(
+            {
+                "case": case,
+                "metric": metric,
+                "old": old_value,
+                "new": new_value,
+                "change": round(change, 4),
+                "regression": worse > threshold,
+            }
+        )
+    return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    if not rows:
+        return "Ingen fælles metrikker at sammenligne."
+    width = max(len(r["case"]) for r in rows)
+    out = [f"{'case'.ljust(width)}  {'metric':<15}{'old':>12}{'new':>12}{'change':>10}"]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        out.append(
+            f"{r['case'].ljust(width)}  {r['metric']:<15}"
+            f"{r['old']:>12.3f}{r['new']:>12.3f}{r['change']:>+10.1%}{flag}"
+        )
+    return "\n".join(out)
@@ -0,0 +1,108 @@
+"""
+Macro load tests: drive ``Tools.run`` of both tool modules against the stub
+server at fixed concurrency levels and report throughput and latency
+percentiles.
+"""
+
+import io
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Sequence
+
+import mfkn_search_tool
+import openwebui_tool
+
+from .micro import QUERIES
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentil af en allerede sorteret liste."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _mfkn_factory(mcp_url: str) -> Callable[[int], str]:
+    tool = mfkn_search_tool.Tools()
+    tool.debug = False
+    tool.prefetch_top_n = 0  # kun søgetrafik – sammenlignelig på tværs af commits
+    tool.mcp_url = mcp_url
+
+    def call(i: int) -> str:
+        return tool.run(query=QUERIES[i % len(QUERIES)], page=1 + i % 3)
+
+    return call
+
+
+def _openwebui_factory(mcp_url: str) -> Callable[[int], str]:
+    tool = openwebui_tool.Tools()
+    tool.prefetch_top_n = 0
+    tool.mcp_url = mcp_url
+
+    def call(i: int) -> str:
+        return tool.run(query=QUERIES[i % len(QUERIES)], page=1 + i % 3)
+
+    return call
+
+
+def _is_error(text: str) -> bool:
+    return text.startswith(("Der opstod en fejl", "❌", "⏱️", "🔌"))
+
+
+TARGETS: Dict[str, Callable[[str], Callable[[int], str]]] = {
+    "mfkn_search_tool": _mfkn_factory,
+    "openwebui_tool": _openwebui_factory,
+}
+
+
+def run_level(call: Callable[[int], str], concurrency: int, requests: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int):
+        start = time.perf_counter()
+        text = call(i)
+        return time.perf_counter() - start, _is_error(text)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, failed in pool.map(timed, range(requests)):
+            latencies.append(elapsed)
+            errors += failed
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ms = [v * 1000.0 for v in latencies]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+def run_load(
+    mcp_url: str,
+    concurrency_levels: Sequence[int] = (1, 4, 16),
+    requests_per_level: int = 200,
+    targets: Sequence[str] = tuple(TARGETS),
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    # openwebui_tool printer hvert kald – hold benchmark-output rent
+    with redirect_stdout(io.StringIO()):
+        for name in targets:
+            call = TARGETS[name](mcp_url)
+            call(0)  # opvarmning
+            results[name] = {
+                f"c{level}": run_level(call, level, requests_per_level)
+                for level in concurrency_levels
+            }
+    return results
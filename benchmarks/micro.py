@@ -0,0 +1,126 @@
+"""
+Micro-benchmarks for the pure helpers in mfkn_search_tool.
+
+Each case is timed with ``timeit`` over several repeats; the result is the
+per-call time in microseconds (min / median / mean over the repeats).
+"""
+
+import statistics
+import timeit
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import mfkn_search_tool
+
+from .stub_server import load_fixtures
+
+QUERIES: List[str] = [
+    "jordforurening § 72 MBL",
+    "bevisbyrde ved kulbrinteforurening på tankstation",
+    "NBL § 3 strandbeskyttelse dispensation",
+    "støj fra vindmøller og lugtgener fra staldanlæg",
+    "praksis om screeningsafgørelse og afværgeforanstaltninger efter VVM",
+]
+
+
+class _FakeResponse:
+    """Minimal requests.Response-lignende objekt til in-process kørsel."""
+
+    def __init__(self, data: dict):
+        self._data = data
+        self.status_code = 200
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._data
+
+
+@contextmanager
+def in_process_transport(data: dict):
+    """Lader Tools.run svare fra `data` uden HTTP, så kun formattering måles."""
+    original = mfkn_search_tool.requests.post
+    mfkn_search_tool.requests.post = lambda *a, **kw: _FakeResponse(data)
+    try:
+        yield
+    finally:
+        mfkn_search_tool.requests.post = original
+
+
+def _time(fn: Callable[[], object], number: int, repeat: int) -> Dict[str, float]:
+    runs = timeit.Timer(fn).repeat(repeat=repeat, number=number)
+    per_call = [r / number * 1e6 for r in runs]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+    }
+
+
+def run_micro(
+    number: int = 200,
+    repeat: int = 5,
+    only: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, float]]:
+    tool = mfkn_search_tool.Tools()
+    tool.debug = False
+    tool.prefetch_top_n = 0  # kun formattering – ingen baggrundskald
+
+    search_data = load_fixtures()["portalSearch"]
+    bodies = [p.get("body", "") for p in search_data.get("publications", [])]
+    stripped = [tool._strip_html(b) for b in bodies]
+    detected = [tool._detect_terms(q, None) for q in QUERIES]
+
+    def detect_terms():
+        for q in QUERIES:
+            tool._detect_terms(q, None)
+
+    def build_query():
+        for q, (laws, terms) in zip(QUERIES, detected):
+            tool._build_query(q, laws, terms)
+
+    def strip_html():
+        for b in bodies:
+            tool._strip_html(b)
+
+    def make_summary():
+        for t in stripped:
+            tool._make_summary(t)
+
+    def query_plan_cached():
+        for q in QUERIES:
+            tool._get_plan(q, None, None, "Score")
+
+    def run_format():
+        tool.run(QUERIES[0])
+
+    def run_format_budgeted():
+        budget = tool.output_budget_tokens
+        tool.output_budget_tokens = 700
+        try:
+            tool.run(QUERIES[0])
+        finally:
+            tool.output_budget_tokens = budget
+
+    cases: Dict[str, Callable[[], object]] = {
+        "detect_terms": detect_terms,
+        "build_query": build_query,
+        "query_plan_cached": query_plan_cached,
+        "strip_html": strip_html,
+        "make_summary": make_summary,
+        "run_format": run_format,
+        "run_format_budgeted": run_format_budgeted,
+    }
+
+    results: Dict[str, Dict[str, float]] = {}
+    with in_process_transport(search_data):
+        for name, fn in cases.items():
+            if only and name not in only:
+                continue
+            # run_format er ~100x tungere end de andre – skaler antal kald ned
+            n = max(1, number // 10) if name.startswith("run_format") else number
+            results[name] = _time(fn, n, repeat)
+    return results
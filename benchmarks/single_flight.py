@@ -0,0 +1,124 @@
+"""
+Cross-process single-flight check for shared_cache.py.
+
+Starts the stub server, forks N worker processes per tool that all share
+one SQLite cache file, releases them at the same moment with an identical
+search, and counts the upstream ``searchPortal`` calls:
+
+    python -m benchmarks.single_flight --workers 6 --latency-ms 300
+
+Cases:
+- success: stub answers normally - expect exactly 1 upstream call
+- failure: stub answers HTTP 500 - expect exactly 1 upstream call, and
+  every worker reports the error after about one round trip
+
+Exits with status 1 if any case makes more than one upstream call.
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import mfkn_search_tool
+import openwebui_tool
+
+from .load import _is_error
+from .stub_server import StubServer
+
+QUERY = "jordforurening § 72 MBL"
+
+TOOLS = {
+    "mfkn_search_tool": mfkn_search_tool,
+    "openwebui_tool": openwebui_tool,
+}
+
+
+def _worker(name: str, mcp_url: str, cache_path: str, barrier, results) -> None:
+    tool = TOOLS[name].Tools()
+    tool.mcp_url = mcp_url
+    tool.shared_cache_path = cache_path
+    tool.prefetch_top_n = 0
+    if name == "mfkn_search_tool":
+        tool.debug = False
+
+    barrier.wait()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        text = tool.run(query=QUERY)
+    results.put((_is_error(text), time.perf_counter() - start))
+
+
+def run_case(
+    name: str,
+    server: StubServer,
+    workers: int,
+    error_rate: float,
+) -> Dict[str, object]:
+    # ny cache-fil pr. case, så intet er varmt på forhånd
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="single-flight-"), "cache.sqlite3")
+    server.error_rate = error_rate
+    server.reset_counts()
+
+    barrier = mp.Barrier(workers)
+    results = mp.Queue()
+    procs = [
+        mp.Process(target=_worker, args=(name, server.url, cache_path, barrier, results))
+        for _ in range(workers)
+    ]
+    wall_start = time.perf_counter()
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=120) for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "tool": name,
+        "case": "failure" if error_rate else "success",
+        "workers": workers,
+        "upstream_calls": server.request_counts.get("searchPortal", 0),
+        "error_replies": sum(1 for failed, _ in outcomes if failed),
+        "max_latency_s": round(max(elapsed for _, elapsed in outcomes), 3),
+        "wall_s": round(wall, 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.single_flight")
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    # fork deler stub-serverens adresse uden ekstra opsætning; spawn virker også
+    if "fork" in mp.get_all_start_methods():
+        mp.set_start_method("fork", force=True)
+
+    rows: List[Dict[str, object]] = []
+    with StubServer(latency_ms=args.latency_ms) as server:
+        for name in TOOLS:
+            for error_rate in (0.0, 1.0):
+                rows.append(run_case(name, server, args.workers, error_rate))
+
+    ok = True
+    for row in rows:
+        passed = row["upstream_calls"] == 1 and (
+            row["error_replies"] == (row["workers"] if row["case"] == "failure" else 0)
+        )
+        ok &= passed
+        print(
+            f"{row['tool']:<18} {row['case']:<8} workers={row['workers']} "
+            f"upstream_calls={row['upstream_calls']} error_replies={row['error_replies']} "
+            f"max_latency={row['max_latency_s']}s  {'OK' if passed else 'FAIL'}"
+        )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
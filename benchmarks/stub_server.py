@@ -0,0 +1,213 @@
+"""
+Local stub of the naevneneshus MCP server.
+
+Replays ``searchPortal`` / ``getPublicationDetail`` responses from
+``benchmarks/fixtures`` so the Python tools can be benchmarked without
+touching Supabase or the portals. Fixtures:
+
+- ``searchPortal.json``: the MCP handler's shape (``results`` with
+  ``publicationDate``, ``caseNumber``, ``cleanBody``, ``highlights`` ...),
+  served to openwebui_tool
+- ``portalSearch.json``: the raw portal shape (``publications`` with
+  ``jnr``, ``published_date``, ``body``) that mfkn_search_tool parses,
+  served on ``POST .../search``
+- ``getPublicationDetail.json``
+
+Latency and errors can be injected:
+
+    python -m benchmarks.stub_server --port 8787 --latency-ms 40 --error-rate 0.05
+
+Point a tool at it with ``tool.mcp_url = server.url``.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, dict]:
+    """Indlæser fixtures – filnavnet (uden .json) er nøglen."""
+    return {
+        path.stem: json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(fixtures_dir.glob("*.json"))
+    }
+
+
+class StubServer:
+    """
+    Threaded HTTP server that answers like the MCP edge function.
+
+    Args:
+        host/port: Bind address (port 0 picks a free port)
+        latency_ms: Fixed delay added to every response
+        jitter_ms: Extra uniform random delay (0..jitter_ms)
+        error_rate: Fraction of requests answered with HTTP 500
+        seed: Seed for latency jitter and error injection
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = 1234,
+        fixtures: Optional[Dict[str, dict]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mcp-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_counts.clear()
+
+    # ------------------------------------------------------------
+    # Svarlogik
+    # ------------------------------------------------------------
+    def _draw(self) -> tuple:
+        """Returnerer (forsinkelse i sekunder, skal-fejle) for ét kald."""
+        with self._lock:
+            delay = self.latency_ms
+            if self.jitter_ms:
+                delay += self._rng.uniform(0, self.jitter_ms)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay / 1000.0, fail
+
+    def _respond(self, operation: str, params: dict, path: str = "/") -> tuple:
+        with self._lock:
+            self.request_counts[operation] = self.request_counts.get(operation, 0) + 1
+
+        delay, fail = self._draw()
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            return 500, {"error": "Injected error from stub server"}
+
+        name = operation
+        # mfkn_search_tool poster til .../search og læser portalens rå format
+        if operation == "searchPortal" and urlparse(path).path.rstrip("/").endswith("/search"):
+            name = "portalSearch"
+
+        fixture = self.fixtures.get(name)
+        if fixture is None:
+            return 500, {"error": f"Unknown operation: {operation}"}
+
+        body = dict(fixture)
+        if operation == "getPublicationDetail" and params.get("id"):
+            body["id"] = params["id"]
+        if operation == "searchPortal" and "query" in params:
+            body["query"] = params["query"]
+        return 200, body
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: dict) -> None:
+                raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                qs = parse_qs(urlparse(self.path).query)
+                params = {k: v[0] for k, v in qs.items()}
+                operation = params.pop("operation", "listPortals")
+                self._send(*stub._respond(operation, params, self.path))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    params = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send(400, {"error": "Invalid JSON body"})
+                    return
+                operation = params.pop("operation", "searchPortal")
+                self._send(*stub._respond(operation, params, self.path))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local MCP/portal stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Stub MCP server listening on {server.url} (Ctrl+C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,48 @@
 import requests
 import re
 import json
-from typing import List, Optional, Dict, Tuple
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Dict, Tuple
+
+try:
+    # Valgfri: delt cache mellem OpenWebUI-workers (shared_cache.py)
+    from shared_cache import SharedCache, make_key
+except ImportError:  # enkeltfils-deployment – kun lokal cache
+    SharedCache = None
+
+
+class QueryPlan(NamedTuple):
+    """Uforanderlig søgeplan – alt i run() der ikke afhænger af page."""
+
+    law_titles: Tuple[str, ...]
+    domain_terms: Tuple[str, ...]
+    built_query: str
+    categories: Tuple[Tuple[str, str], ...]  # (id, title)
+
+    def categories_payload(self) -> List[Dict[str, str]]:
+        return [{"id": cid, "title": title} for cid, title in self.categories]
+
+
+class _PrefetchBatch:
+    """Prefetch-opgaverne fra én søgning – kan annulleres uden at røre andre."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.futures: List[Future] = []
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
 
 
 class Tools:
@@ -44,6 +85,65 @@ class Tools:
         self.page_size = 10
         self.wildcard = "*"
 
+        # ========= QUERY PLAN CACHE =========
+        # LRU over (query, lovomraader, types, sort) -> QueryPlan.
+        # Tømmes automatisk når category_ids / law_keyword_map /
+        # domain_synonyms udskiftes. Tabellerne er read-only efter __init__,
+        # så in-place ændringer fejler i stedet for at give forældede
+        # planer – tildel en ny dict for at ændre dem. 0 = slået fra.
+        self.query_plan_cache_size = 256
+        self._plan_cache: "OrderedDict[tuple, QueryPlan]" = OrderedDict()
+        self._plan_lock = threading.Lock()
+        self._plan_hits = 0
+        self._plan_misses = 0
+        self._tables_version = 0
+        self._frozen_tables: Optional[tuple] = None
+        self._plan_tables_token: Optional[int] = None
+        # ====================================
+
+        # ========= DETAIL CACHE / PREFETCH =========
+        # Efter hver søgning hentes de fulde afgørelser for de øverste
+        # prefetch_top_n resultater i baggrunden, så get_detail(id) kan
+        # svare fra hukommelsen. detail_cache_dir = sti slår diskcache til.
+        self.detail_cache_size = 128
+        self.detail_cache_dir: Optional[str] = None
+        self.prefetch_top_n = 3
+        self.prefetch_workers = 3
+        self.prefetch_rate_per_sec = 5.0  # maks. opstartede detail-kald/sek.
+        self._detail_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._detail_lock = threading.Lock()
+        self._detail_inflight: Dict[str, Future] = {}
+        self._detail_stats = {"memory": 0, "disk": 0, "fetched": 0, "prefetched": 0}
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        # én batch pr. søgetekst – samtidige chats aflyser ikke hinanden
+        self._prefetch_batches: Dict[str, _PrefetchBatch] = {}
+        self._prefetch_next_slot = 0.0  # rate limit gælder på tværs af søgninger
+        # ===========================================
+
+        # ========= DELT CACHE (flere workers) =========
+        # Sæt til en fil alle workers kan nå for at dele søgesvar, detaljer
+        # og resuméer – kræver shared_cache.py på PYTHONPATH. Identiske
+        # samtidige kald giver kun ét kald til MCP serveren.
+        # Bemærk: cache-hits når ikke MCP serverens query-log.
+        self.shared_cache_path: Optional[str] = None
+        self.shared_search_ttl = 300
+        self.shared_detail_ttl = 86400
+        self._shared_cache = None
+        # ==============================================
+
+        # ========= OUTPUT-BUDGET =========
+        # Hvor meget tekst run() må returnere til LLM'en (debug-blok ikke
+        # medregnet). Når budgettet er brugt, strippes/resumeres de
+        # resterende resultater ikke, men vises som korte én-linjere.
+        # Hovedet (søgning, kilde, antal) og "udeladt"/"næste side"-linjerne
+        # vises altid og er budgettets minimum – et mindre budget hæves
+        # til dét. None = ubegrænset.
+        self.output_budget_tokens: Optional[int] = 3000
+        self.chars_per_token = 4
+        # Øvre skøn for _make_summary (≤ 100 ord) – bruges før resuméet bygges
+        self.summary_chars_estimate = 600
+        # =================================
+
         # ========= DEBUG =========
         # Slå fra i produktion:
         #   self.debug = False
@@ -218,6 +318,8 @@ class Tools:
             }
         )
 
+        self._freeze_tables()
+
     # ============================================================
     # Hjælpefunktioner
     # ============================================================
@@ -420,6 +522,365 @@ class Tools:
 
         return base_query
 
+    # ============================================================
+    # Query plan cache
+    # ============================================================
+    def _freeze_tables(self) -> None:
+        """
+        Gør nye tabeller read-only (kopi), så de ikke kan ændres in-place,
+        og tæl _tables_version op når en tabel er udskiftet.
+        """
+        if not isinstance(self.category_ids, MappingProxyType):
+            self.category_ids = MappingProxyType(dict(self.category_ids))
+        if not isinstance(self.law_keyword_map, MappingProxyType):
+            self.law_keyword_map = MappingProxyType(
+                {k: tuple(v) for k, v in self.law_keyword_map.items()}
+            )
+        if not isinstance(self.domain_synonyms, MappingProxyType):
+            self.domain_synonyms = MappingProxyType(dict(self.domain_synonyms))
+
+        # Sammenlign med `is` på de tabeller vi holder fast i – id() kan
+        # genbruges, når en gammel tabel bliver frigivet
+        tables = (self.category_ids, self.law_keyword_map, self.domain_synonyms)
+        current = self._frozen_tables
+        if current is None or any(a is not b for a, b in zip(tables, current)):
+            with self._plan_lock:
+                self._frozen_tables = tables
+                self._tables_version += 1
+
+    def _reload_tables(
+        self,
+        category_ids: Optional[Dict[str, str]] = None,
+        law_keyword_map: Optional[Dict[str, List[str]]] = None,
+        domain_synonyms: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Udskift keyword-/kategoritabellerne og invalider query plan cachen."""
+        if category_ids is not None:
+            self.category_ids = category_ids
+        if law_keyword_map is not None:
+            self.law_keyword_map = law_keyword_map
+        if domain_synonyms is not None:
+            self.domain_synonyms = domain_synonyms
+        self._freeze_tables()
+        with self._plan_lock:
+            self._plan_cache.clear()
+
+    def _compute_plan(
+        self,
+        query: str,
+        lovomraader: Optional[List[str]],
+    ) -> QueryPlan:
+        # 1) detekter lovområder og fagord
+        law_titles, domain_terms = self._detect_terms(query, lovomraader)
+
+        # 2) byg query (kun brugerord – lovområder filtreres via categories)
+        built_query = self._build_query(query, law_titles, domain_terms)
+
+        # 3) byg categories-listen (law_titles er allerede unikke)
+        categories = tuple(
+            (self.category_ids[title], title)
+            for title in law_titles
+            if self.category_ids.get(title)
+        )
+
+        return QueryPlan(
+            tuple(law_titles), tuple(domain_terms), built_query, categories
+        )
+
+    def _get_plan(
+        self,
+        query: str,
+        lovomraader: Optional[List[str]],
+        types: Optional[List[str]],
+        sort: str,
+    ) -> QueryPlan:
+        if self.query_plan_cache_size <= 0:
+            return self._compute_plan(query, lovomraader)
+
+        key = (query, tuple(lovomraader or ()), tuple(types or ()), sort)
+        self._freeze_tables()  # tabeller tildelt udefra siden sidst
+        token = self._tables_version
+
+        with self._plan_lock:
+            if token != self._plan_tables_token:
+                self._plan_cache.clear()
+                self._plan_tables_token = token
+            plan = self._plan_cache.get(key)
+            if plan is not None:
+                self._plan_cache.move_to_end(key)
+                self._plan_hits += 1
+                return plan
+            self._plan_misses += 1
+
+        plan = self._compute_plan(query, lovomraader)
+
+        with self._plan_lock:
+            if token == self._plan_tables_token:
+                self._plan_cache[key] = plan
+                while len(self._plan_cache) > self.query_plan_cache_size:
+                    self._plan_cache.popitem(last=False)
+        return plan
+
+    def _query_plan_stats(self) -> Dict[str, float]:
+        """
+        Hit rate og omtrentligt hukommelsesforbrug for query plan cachen.
+
+        Kun til drift – privat, så OpenWebUI ikke gør den til et LLM-værktøj.
+        """
+
+        def size_of(obj) -> int:
+            n = sys.getsizeof(obj)
+            if isinstance(obj, (tuple, list)):
+                n += sum(size_of(o) for o in obj)
+            return n
+
+        with self._plan_lock:
+            entries = list(self._plan_cache.items())
+            hits, misses = self._plan_hits, self._plan_misses
+
+        total = hits + misses
+        return {
+            "size": len(entries),
+            "maxsize": self.query_plan_cache_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "memory_bytes": sys.getsizeof(self._plan_cache)
+            + sum(size_of(k) + size_of(v) for k, v in entries),
+        }
+
+    # ============================================================
+    # Delt cache mellem workers
+    # ============================================================
+    def _shared(self):
+        if SharedCache is None or not self.shared_cache_path:
+            return None
+        cache = self._shared_cache
+        if cache is None or cache.path != self.shared_cache_path:
+            self._shared_cache = SharedCache(self.shared_cache_path)
+        return self._shared_cache
+
+    def _post_json(self, url: str, body: dict, namespace: str, ttl: float) -> dict:
+        """POST til MCP serveren – via den delte cache (single-flight), hvis slået til."""
+
+        def fetch() -> dict:
+            resp = requests.post(url, json=body, headers=self.mcp_headers, timeout=30)
+            resp.raise_for_status()
+            return resp.json()
+
+        shared = self._shared()
+        if shared is None:
+            return fetch()
+        return shared.get_or_compute(make_key(namespace, [url, body]), fetch, ttl)
+
+    def _summary_for(self, pid: str, body: str) -> str:
+        """Strip + AI-resumé, delt mellem workers når den delte cache er slået til."""
+        shared = self._shared()
+        if shared is None:
+            return self._make_summary(self._strip_html(body))
+
+        key = make_key("summary", [pid, body])
+        summary = shared.get(key)
+        if summary is None:
+            summary = self._make_summary(self._strip_html(body))
+            shared.set(key, summary, self.shared_detail_ttl)
+        return summary
+
+    # ============================================================
+    # Publikationsdetaljer – cache og baggrunds-prefetch
+    # ============================================================
+    def _fetch_detail(self, pid: str) -> dict:
+        body = {
+            "operation": "getPublicationDetail",
+            "portal": "mfkn.naevneneshus.dk",
+            "id": pid,
+        }
+        return self._post_json(self.mcp_url, body, "detail", self.shared_detail_ttl)
+
+    def _detail_path(self, pid: str) -> Optional[str]:
+        if not self.detail_cache_dir:
+            return None
+        safe = re.sub(r"[^A-Za-z0-9_-]", "_", pid)
+        return os.path.join(self.detail_cache_dir, f"{safe}.json")
+
+    def _remember_detail(self, pid: str, detail: dict) -> None:
+        with self._detail_lock:
+            self._detail_cache[pid] = detail
+            self._detail_cache.move_to_end(pid)
+            while len(self._detail_cache) > self.detail_cache_size:
+                self._detail_cache.popitem(last=False)
+
+    def _cached_detail(self, pid: str) -> Optional[dict]:
+        with self._detail_lock:
+            detail = self._detail_cache.get(pid)
+            if detail is not None:
+                self._detail_cache.move_to_end(pid)
+                self._detail_stats["memory"] += 1
+                return detail
+
+        path = self._detail_path(pid)
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    detail = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._remember_detail(pid, detail)
+            with self._detail_lock:
+                self._detail_stats["disk"] += 1
+            return detail
+        return None
+
+    def _load_detail(self, pid: str, prefetch: bool = False) -> dict:
+        """Hukommelse → disk → MCP server. Samtidige kald for samme id deler ét request."""
+        detail = self._cached_detail(pid)
+        if detail is not None:
+            return detail
+
+        with self._detail_lock:
+            future = self._detail_inflight.get(pid)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._detail_inflight[pid] = future
+
+        if not owner:
+            return future.result(timeout=30)
+
+        try:
+            detail = self._fetch_detail(pid)
+            self._remember_detail(pid, detail)
+            path = self._detail_path(pid)
+            if path:
+                os.makedirs(self.detail_cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(detail, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            with self._detail_lock:
+                self._detail_stats["prefetched" if prefetch else "fetched"] += 1
+            future.set_result(detail)
+            return detail
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._detail_lock:
+                self._detail_inflight.pop(pid, None)
+
+    def _prefetch_one(self, pid: str, batch: _PrefetchBatch) -> None:
+        # Rate limit: et tidsvindue tages først, når kaldet faktisk starter,
+        # så aflyste batches ikke skubber de næste søgningers prefetch
+        while True:
+            with self._detail_lock:
+                now = time.monotonic()
+                wait = self._prefetch_next_slot - now
+                if wait <= 0:
+                    if self.prefetch_rate_per_sec > 0:
+                        self._prefetch_next_slot = now + 1.0 / self.prefetch_rate_per_sec
+                    break
+            if batch.cancelled.wait(wait):
+                return
+        if batch.cancelled.is_set():
+            return
+        try:
+            self._load_detail(pid, prefetch=True)
+        except Exception:
+            pass  # prefetch er best effort – get_detail prøver igen
+
+    def _schedule_prefetch(self, query: str, ids: List[str]) -> None:
+        """
+        Starter baggrunds-hentning og returnerer med det samme. En ny søgning
+        på samme tekst (fx næste side) afløser kun sin egen tidligere batch.
+        """
+        self._cancel_prefetch(query)
+        ids = self._unique([i for i in ids if i])
+        if not ids or self.prefetch_top_n <= 0:
+            return
+
+        batch = _PrefetchBatch()
+        with self._detail_lock:
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers,
+                    thread_name_prefix="mfkn-prefetch",
+                )
+            # ryd færdige batches op
+            for key in [k for k, b in self._prefetch_batches.items() if b.done()]:
+                del self._prefetch_batches[key]
+            batch.futures = [
+                self._prefetch_pool.submit(self._prefetch_one, pid, batch)
+                for pid in ids[: self.prefetch_top_n]
+                if pid not in self._detail_cache
+            ]
+            self._prefetch_batches[query] = batch
+
+    def _cancel_prefetch(self, query: Optional[str] = None) -> None:
+        """
+        Afbryd prefetch for én søgetekst, eller alle når query er None
+        (kørende HTTP-kald får lov at slutte).
+        """
+        with self._detail_lock:
+            if query is None:
+                batches = list(self._prefetch_batches.values())
+                self._prefetch_batches.clear()
+            else:
+                batch = self._prefetch_batches.pop(query, None)
+                batches = [batch] if batch else []
+        for batch in batches:
+            batch.cancel()
+
+    def _detail_cache_stats(self) -> Dict[str, int]:
+        with self._detail_lock:
+            stats = dict(self._detail_stats)
+            stats["size"] = len(self._detail_cache)
+            stats["inflight"] = len(self._detail_inflight)
+        return stats
+
+    def get_detail(self, id: str) -> str:
+        """
+        Hent den fulde afgørelse/nyhed for et id fra søgeresultaterne.
+
+        Svarer fra cachen, hvis detaljen allerede er prefetchet.
+        """
+        try:
+            detail = self._load_detail(id)
+        except Exception as e:
+            return f"Der opstod en fejl ved hentning af {id}: {e}."
+
+        ptype = detail.get("type") or "ruling"
+        link = detail.get("url") or (
+            f"{self.base_url}/nyhed/{id}"
+            if ptype == "news"
+            else f"{self.base_url}/afgoerelse/{id}"
+        )
+        body = self._strip_html(detail.get("body"))
+
+        return (
+            f"• Titel: {detail.get('title') or 'ikke oplyst'}\n"
+            f"• Journalnr: {detail.get('caseNumber') or 'ikke oplyst'}\n"
+            f"• Kategori(er): {', '.join(detail.get('categories') or []) or 'ikke oplyst'}\n"
+            f"• Publiceret: {detail.get('publicationDate') or 'ikke oplyst'}\n"
+            f"• AI-resumé: {self._make_summary(body)}\n"
+            f"• Link: {link}\n"
+            "───────────────────────────────\n"
+            f"{body or 'ikke oplyst'}"
+        )
+
+    # ============================================================
+    # Output-budget
+    # ============================================================
+    def _output_budget_chars(self, minimum: int = 0) -> Optional[int]:
+        """Budget i tegn – aldrig under minimum (de linjer der altid vises)."""
+        if self.output_budget_tokens is None:
+            return None
+        return max(self.output_budget_tokens * self.chars_per_token, minimum)
+
+    def _estimate_block_chars(self, *fields: str) -> int:
+        """Skøn over en fuld resultatblok uden at strippe/resumere body."""
+        # 8 labels + separator ≈ 130 tegn
+        return 130 + sum(len(f) for f in fields) + self.summary_chars_estimate
+
     def _format_debug(
         self,
         payload,
@@ -455,18 +916,12 @@ class Tools:
         sort: str = "Score",  # eller "Descending" mv., hvis I ønsker
     ) -> str:
 
-        # 1) detekter lovområder og fagord
-        law_titles, domain_terms = self._detect_terms(query, lovomraader)
-
-        # 2) byg query (kun brugerord – lovområder filtreres via categories)
-        built_query = self._build_query(query, law_titles, domain_terms)
-
-        # 3) byg categories-listen
-        categories = []
-        for title in self._unique(law_titles):
-            cid = self.category_ids.get(title)
-            if cid:
-                categories.append({"id": cid, "title": title})
+        # 1-3) lovområder, fagord, query og categories (cachet pr. query)
+        plan = self._get_plan(query, lovomraader, types, sort)
+        law_titles = list(plan.law_titles)
+        domain_terms = list(plan.domain_terms)
+        built_query = plan.built_query
+        categories = plan.categories_payload()
 
         # 4) typer
         types_payload = types or []
@@ -488,9 +943,9 @@ class Tools:
 
         # 6) kald MCP server (includes automatic logging)
         try:
-            resp = requests.post(
+            data = self._post_json(
                 f"{self.mcp_url}/search",
-                json={
+                {
                     "portal": "mfkn.naevneneshus.dk",
                     "query": built_query,
                     "categories": categories,
@@ -501,11 +956,9 @@ class Tools:
                     "userIdentifier": "openwebui-python-tool",
                     "originalQuery": query
                 },
-                headers=self.mcp_headers,
-                timeout=30
+                "search",
+                self.shared_search_ttl,
             )
-            resp.raise_for_status()
-            data = resp.json()
             if self.debug and page == 1:
                 response_debug_data = data
         except Exception as e:
@@ -519,6 +972,9 @@ class Tools:
         publications = data.get("publications") or []
         total_count = data.get("totalCount", 0)
 
+        # hent top-resultaternes detaljer i baggrunden (blokerer ikke svaret)
+        self._schedule_prefetch(query, [pub.get("id") for pub in publications])
+
         debug_block = (
             self._format_debug(
                 payload,
@@ -548,29 +1004,81 @@ class Tools:
         )
         out.append("")
         out.append(f"Antal afgørelser/nyheder i alt: {total_count}")
-        out.append(f"Antal vist i denne søgning: {len(publications)}")
+        shown_idx = len(out)
+        out.append("")  # "Antal vist" udfyldes når vi ved, hvad der blev vist
         out.append("")
         out.append("Resultater:")
         out.append("───────────────────────────────")
 
+        # billige felter + én-linjer for alle resultater først, så budgettet
+        # altid kan reservere plads til én-linjer for resten af siden
+        rows = []
         for pub in publications:
             pid = pub.get("id") or "ikke oplyst"
             ptype = pub.get("type") or "ruling"
             title = pub.get("title") or "ikke oplyst"
-            cats = ", ".join(pub.get("categories") or []) or "ikke oplyst"
-            jnr = ", ".join(pub.get("jnr") or []) or "ikke oplyst"
             date_str = pub.get("date") or "ikke oplyst"
-            pub_date = pub.get("published_date") or "ikke oplyst"
-            authority = pub.get("authority") or "ikke oplyst"
-
-            clean_body = self._strip_html(pub.get("body", ""))
-            ai_summary = self._make_summary(clean_body)
-
+            jnr = ", ".join(pub.get("jnr") or []) or "ikke oplyst"
             link = (
                 f"{self.base_url}/nyhed/{pid}"
                 if ptype == "news"
                 else f"{self.base_url}/afgoerelse/{pid}"
             )
+            line = f"• {title} ({date_str}, jnr. {jnr}) – {link}"
+            rows.append((pub, pid, title, date_str, jnr, link, line))
+
+        # reserved[i] = plads til én-linjer for resultat i og frem
+        reserved = [0] * (len(rows) + 1)
+        for i in range(len(rows) - 1, -1, -1):
+            reserved[i] = reserved[i + 1] + len(rows[i][6]) + 1
+
+        # hovedet + plads til "Antal vist"-linjen, som først udfyldes til sidst
+        used = sum(len(line) + 1 for line in out) + 60
+        footer = 120  # plads til "udeladt"- og "næste side"-linjerne
+        budget = self._output_budget_chars(minimum=used + footer)
+        if budget is not None:
+            budget -= footer
+        compact_header = "Øvrige resultater (kort form):"
+        compact = False
+        n_full = n_compact = 0
+
+        for idx, (pub, pid, title, date_str, jnr, link, line) in enumerate(rows):
+            cats = ", ".join(pub.get("categories") or []) or "ikke oplyst"
+            pub_date = pub.get("published_date") or "ikke oplyst"
+            authority = pub.get("authority") or "ikke oplyst"
+
+            # skøn før vi bygger blokken – der skal stadig være plads til
+            # én-linjer for resten; ellers kort form resten af vejen
+            if not compact and budget is not None:
+                estimate = self._estimate_block_chars(
+                    title, cats, jnr, date_str, pub_date, authority, link
+                )
+                rest = reserved[idx + 1] + len(compact_header) + 1
+                if used + estimate + rest > budget:
+                    compact = True
+
+            if compact:
+                # overskriften følger med den første én-linje
+                need = len(line) + 1
+                if not n_compact:
+                    need += len(compact_header) + 1
+                if used + need > budget:
+                    out.append(
+                        f"… {len(rows) - idx} resultat(er) mere udeladt "
+                        "(output-budget nået)."
+                    )
+                    break
+                if not n_compact:
+                    out.append(compact_header)
+                out.append(line)
+                used += need
+                n_compact += 1
+                continue
+
+            ai_summary = self._summary_for(pid, pub.get("body") or "")
+            # hold resuméet inden for skønnet, så budgettet holder
+            if budget is not None and len(ai_summary) > self.summary_chars_estimate:
+                ai_summary = ai_summary[: self.summary_chars_estimate - 3].rstrip() + "..."
 
             out.append(
                 f"• Titel: {title}\n"
@@ -583,6 +1091,13 @@ class Tools:
                 f"• Link: {link}\n"
                 "───────────────────────────────"
             )
+            used += len(out[-1]) + 1
+            n_full += 1
+
+        shown = f"Antal vist i denne søgning: {n_full + n_compact}"
+        if n_compact:
+            shown += f" ({n_full} fuldt, {n_compact} i kort form)"
+        out[shown_idx] = shown
 
         if skip + size < total_count:
             out.append(
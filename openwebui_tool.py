@@ -10,8 +10,38 @@ Setup:
 3. Copy this entire file as a new Function Tool in OpenWebUI
 """
 
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import requests
-from typing import Optional, Dict
+from typing import Any, Callable, Optional, Dict, List, Tuple
+
+try:
+    # Optional: cache shared by all OpenWebUI workers (shared_cache.py)
+    from shared_cache import SharedCache, make_key
+except ImportError:  # single-file deployment - per-process cache only
+    SharedCache = None
+
+class _PrefetchBatch:
+    """Prefetch work started by one search - cancellable on its own."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.futures: List[Future] = []
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
 
 class Tools:
     """
@@ -39,6 +69,398 @@ class Tools:
             "Content-Type": "application/json"
         }
 
+        # Detail cache + background prefetch: after each search the full
+        # publications for the top prefetch_top_n results are fetched so a
+        # follow-up get_detail(id) is served from memory (or disk, if
+        # detail_cache_dir is set).
+        self.detail_cache_size = 128
+        self.detail_cache_dir: Optional[str] = None
+        self.prefetch_top_n = 3
+        self.prefetch_workers = 3
+        self.prefetch_rate_per_sec = 5.0  # max detail requests started per second
+        self._detail_cache: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+        self._detail_lock = threading.Lock()
+        self._detail_inflight: Dict[Tuple[str, str], Future] = {}
+        self._detail_stats = {"memory": 0, "disk": 0, "fetched": 0, "prefetched": 0}
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        # One batch per (portal, query) so concurrent chats don't cancel each other
+        self._prefetch_batches: Dict[Tuple[str, str], _PrefetchBatch] = {}
+        self._prefetch_next_slot = 0.0  # rate limit holds across searches
+
+        # Output budget for text returned to the LLM. Search results are
+        # shown in full while they fit and as one-liners after that.
+        # None = unlimited.
+        self.output_budget_tokens: Optional[int] = 3000
+        self.chars_per_token = 4
+
+        # Shared cache for multi-worker deployments: set to a file all
+        # workers can reach to share search responses and details (needs
+        # shared_cache.py on the PYTHONPATH). Identical concurrent requests
+        # then cause a single MCP call. Cache hits are not logged by the
+        # MCP server.
+        self.shared_cache_path: Optional[str] = None
+        self.shared_search_ttl = 300
+        self.shared_detail_ttl = 86400
+        self._shared_cache = None
+
+    # ------------------------------------------------------------
+    # Shared cache across workers
+    # ------------------------------------------------------------
+    def _shared(self):
+        if SharedCache is None or not self.shared_cache_path:
+            return None
+        cache = self._shared_cache
+        if cache is None or cache.path != self.shared_cache_path:
+            self._shared_cache = SharedCache(self.shared_cache_path)
+        return self._shared_cache
+
+    def _cached_call(
+        self,
+        namespace: str,
+        body: dict,
+        fetch: Callable[[], Any],
+        ttl: float,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        shared = self._shared()
+        if shared is None:
+            return fetch()
+        key = make_key(namespace, [self.mcp_url, body])
+        return shared.get_or_compute(key, fetch, ttl, cache_if=cache_if)
+
+    def _error_message(self, e: Exception) -> str:
+        # Errors relayed by the shared cache carry the owner's exception
+        # class names, so every worker gives the same answer
+        error_types = getattr(e, "error_types", ())
+        if isinstance(e, requests.Timeout) or "Timeout" in error_types:
+            return "⏱️ Request timed out. The portal may be slow or unavailable."
+        if isinstance(e, requests.ConnectionError) or "ConnectionError" in error_types:
+            return "🔌 Connection error. Please check your internet connection."
+        return f"❌ Error: {str(e)}"
+
+    # ------------------------------------------------------------
+    # Output budget
+    # ------------------------------------------------------------
+    def _output_budget_chars(self) -> Optional[int]:
+        if self.output_budget_tokens is None:
+            return None
+        return self.output_budget_tokens * self.chars_per_token
+
+    def _render_results(self, text: str) -> str:
+        """
+        Render a JSON search response as markdown, within the output budget.
+
+        Every JSON response is rendered the same way, so the model always sees
+        one shape: full blocks (with id, highlights and body excerpt) while
+        they fit, then one-liners for the rest of the page. Each one-liner
+        also carries the id for get_detail(id). Non-JSON text is forwarded,
+        cut at a line break if it exceeds the budget.
+        """
+        budget = self._output_budget_chars()
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        results = data.get("results") if isinstance(data, dict) else None
+
+        if not isinstance(results, list):
+            if budget is None or len(text) <= budget:
+                return text
+            cut = text.rfind("\n", 0, budget)
+            return text[: cut if cut > 0 else budget] + "\n\n… (truncated: output budget reached)"
+
+        if budget is not None:
+            budget -= 120  # room for the "omitted" note
+        items = [item for item in results if isinstance(item, dict)]
+
+        out = [
+            f"Query: {data.get('query') or data.get('originalQuery') or ''}",
+            f"Total results: {data.get('totalCount', len(items))}",
+            "",  # "Shown" is filled in once we know what fit
+            "",
+        ]
+        # + room for the "Shown" line
+        used = sum(len(line) + 1 for line in out) + 40
+
+        # One-liners are cheap - build them first so the budget can always
+        # reserve room for the rest of the page
+        lines = [
+            f"- [{item.get('id') or '-'}] {item.get('title') or '-'} "
+            f"({item.get('publicationDate') or '-'}, {item.get('caseNumber') or '-'}) "
+            f"{item.get('url') or '-'}"
+            for item in items
+        ]
+        reserved = [0] * (len(lines) + 1)
+        for i in range(len(lines) - 1, -1, -1):
+            reserved[i] = reserved[i + 1] + len(lines[i]) + 1
+
+        compact_header = "More results:"
+        compact = False
+        n_full = n_compact = 0
+
+        for idx, item in enumerate(items):
+            if not compact:
+                categories = ", ".join(item.get("categories") or []) or "-"
+                highlights = " … ".join(item.get("highlights") or [])
+                fields = (
+                    item.get("id") or "-",
+                    item.get("title") or "-",
+                    item.get("publicationDate") or "-",
+                    item.get("caseNumber") or "-",
+                    categories,
+                    re.sub(r"\s+", " ", item.get("abstract") or "").strip(),
+                    highlights,
+                    re.sub(r"\s+", " ", item.get("cleanBody") or "").strip(),
+                    item.get("url") or "-",
+                )
+                # Estimate before building; once over budget the rest go compact
+                if budget is not None:
+                    estimate = 90 + sum(len(f) for f in fields)
+                    rest = reserved[idx + 1] + len(compact_header) + 1
+                    if used + estimate + rest > budget:
+                        compact = True
+                        out.append(compact_header)
+                        used += len(compact_header) + 1
+
+            if compact:
+                line = lines[idx]
+                if used + len(line) + 1 > budget:
+                    out.append(f"… {len(items) - idx} more result(s) omitted (output budget reached)")
+                    break
+                out.append(line)
+                used += len(line) + 1
+                n_compact += 1
+                continue
+
+            pid, title, date, case_number, categories, abstract, highlights, body, url = fields
+            block = (
+                f"**{title}**\n"
+                f"ID: {pid}\n"
+                f"Date: {date} | Case: {case_number}\n"
+                f"Categories: {categories}\n"
+                + (f"Abstract: {abstract}\n" if abstract else "")
+                + (f"Highlights: {highlights}\n" if highlights else "")
+                + (f"Excerpt: {body}\n" if body else "")
+                + f"Link: {url}\n"
+            )
+            out.append(block)
+            used += len(block) + 1
+            n_full += 1
+
+        shown = f"Shown: {n_full + n_compact}"
+        if n_compact:
+            shown += f" ({n_full} in full, {n_compact} compact)"
+        out[2] = shown
+        return "\n".join(out)
+
+    # ------------------------------------------------------------
+    # Publication detail cache and background prefetch
+    # ------------------------------------------------------------
+    def _fetch_detail(self, portal: str, pid: str) -> dict:
+        body = {"operation": "getPublicationDetail", "portal": portal, "id": pid}
+
+        def fetch() -> dict:
+            response = requests.post(
+                self.mcp_url,
+                json=body,
+                headers=self.headers,
+                timeout=30
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self._cached_call("detail", body, fetch, self.shared_detail_ttl)
+
+    def _detail_path(self, key: Tuple[str, str]) -> Optional[str]:
+        if not self.detail_cache_dir:
+            return None
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", "__".join(key))
+        return os.path.join(self.detail_cache_dir, f"{safe}.json")
+
+    def _remember_detail(self, key: Tuple[str, str], detail: dict) -> None:
+        with self._detail_lock:
+            self._detail_cache[key] = detail
+            self._detail_cache.move_to_end(key)
+            while len(self._detail_cache) > self.detail_cache_size:
+                self._detail_cache.popitem(last=False)
+
+    def _cached_detail(self, key: Tuple[str, str]) -> Optional[dict]:
+        with self._detail_lock:
+            detail = self._detail_cache.get(key)
+            if detail is not None:
+                self._detail_cache.move_to_end(key)
+                self._detail_stats["memory"] += 1
+                return detail
+
+        path = self._detail_path(key)
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    detail = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._remember_detail(key, detail)
+            with self._detail_lock:
+                self._detail_stats["disk"] += 1
+            return detail
+        return None
+
+    def _load_detail(self, portal: str, pid: str, prefetch: bool = False) -> dict:
+        """Memory -> disk -> MCP server. Concurrent calls for one id share a request."""
+        key = (portal, pid)
+        detail = self._cached_detail(key)
+        if detail is not None:
+            return detail
+
+        with self._detail_lock:
+            future = self._detail_inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._detail_inflight[key] = future
+
+        if not owner:
+            return future.result(timeout=30)
+
+        try:
+            detail = self._fetch_detail(portal, pid)
+            self._remember_detail(key, detail)
+            path = self._detail_path(key)
+            if path:
+                os.makedirs(self.detail_cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(detail, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            with self._detail_lock:
+                self._detail_stats["prefetched" if prefetch else "fetched"] += 1
+            future.set_result(detail)
+            return detail
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._detail_lock:
+                self._detail_inflight.pop(key, None)
+
+    def _prefetch_one(self, portal: str, pid: str, batch: _PrefetchBatch) -> None:
+        # Rate limit: a start slot is only taken when the request actually
+        # starts, so cancelled batches never push back later searches
+        while True:
+            with self._detail_lock:
+                now = time.monotonic()
+                wait = self._prefetch_next_slot - now
+                if wait <= 0:
+                    if self.prefetch_rate_per_sec > 0:
+                        self._prefetch_next_slot = now + 1.0 / self.prefetch_rate_per_sec
+                    break
+            if batch.cancelled.wait(wait):
+                return
+        if batch.cancelled.is_set():
+            return
+        try:
+            self._load_detail(portal, pid, prefetch=True)
+        except Exception:
+            pass  # best effort - get_detail retries on demand
+
+    def _prefetch_from_text(self, portal: str, text: str, batch: _PrefetchBatch) -> None:
+        # Runs on the prefetch pool so parsing never delays the search reply
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return  # plain-text response - nothing to prefetch
+        if not isinstance(data, dict):
+            return
+        ids: List[str] = []
+        for item in data.get("results") or []:
+            pid = item.get("id") if isinstance(item, dict) else None
+            if pid and pid not in ids:
+                ids.append(pid)
+
+        with self._detail_lock:
+            if batch.cancelled.is_set():
+                return
+            batch.futures.extend(
+                self._prefetch_pool.submit(self._prefetch_one, portal, pid, batch)
+                for pid in ids[: self.prefetch_top_n]
+                if (portal, pid) not in self._detail_cache
+            )
+
+    def _schedule_prefetch(self, portal: str, query: str, text: str) -> None:
+        """
+        Queue detail fetches for the top results and return immediately.
+        A new search for the same query (e.g. the next page) only replaces
+        its own earlier batch.
+        """
+        self._cancel_prefetch(query, portal)
+        if self.prefetch_top_n <= 0:
+            return
+
+        batch = _PrefetchBatch()
+        with self._detail_lock:
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers,
+                    thread_name_prefix="naevneneshus-prefetch",
+                )
+            for key in [k for k, b in self._prefetch_batches.items() if b.done()]:
+                del self._prefetch_batches[key]
+            batch.futures.append(
+                self._prefetch_pool.submit(self._prefetch_from_text, portal, text, batch)
+            )
+            self._prefetch_batches[(portal, query)] = batch
+
+    def _cancel_prefetch(
+        self, query: Optional[str] = None, portal: str = "mfkn.naevneneshus.dk"
+    ) -> None:
+        """
+        Cancel pending prefetches for one query, or all of them when query
+        is None (requests already on the wire finish).
+        """
+        with self._detail_lock:
+            if query is None:
+                batches = list(self._prefetch_batches.values())
+                self._prefetch_batches.clear()
+            else:
+                batch = self._prefetch_batches.pop((portal, query), None)
+                batches = [batch] if batch else []
+        for batch in batches:
+            batch.cancel()
+
+    def _detail_cache_stats(self) -> Dict[str, int]:
+        with self._detail_lock:
+            stats = dict(self._detail_stats)
+            stats["size"] = len(self._detail_cache)
+            stats["inflight"] = len(self._detail_inflight)
+        return stats
+
+    def get_detail(self, id: str, portal: str = "mfkn.naevneneshus.dk") -> str:
+        """
+        Get the full text of a publication from the search results.
+
+        Args:
+            id: Publication id (from the search results)
+            portal: Portal domain (default: mfkn.naevneneshus.dk)
+
+        Returns:
+            Title, case number, categories, date, link and full text.
+            Served from cache when the result was prefetched.
+        """
+        try:
+            detail = self._load_detail(portal, id)
+        except Exception as e:
+            return self._error_message(e)
+
+        categories = ", ".join(detail.get("categories") or []) or "-"
+        return (
+            f"**{detail.get('title') or id}**\n"
+            f"Case number: {detail.get('caseNumber') or '-'}\n"
+            f"Categories: {categories}\n"
+            f"Published: {detail.get('publicationDate') or '-'}\n"
+            f"Link: {detail.get('url') or '-'}\n\n"
+            f"{detail.get('body') or ''}"
+        )
+
     def run(
         self,
         query: str,
@@ -111,30 +533,43 @@ class Tools:
 
         try:
             # Call MCP endpoint (includes automatic logging to database)
-            response = requests.post(
-                self.mcp_url,
-                json=payload,
-                headers=self.headers,
-                timeout=30
+            def fetch() -> dict:
+                response = requests.post(
+                    self.mcp_url,
+                    json=payload,
+                    headers=self.headers,
+                    timeout=30
+                )
+                return {"status": response.status_code, "text": response.text}
+
+            # Only successful responses go into the shared cache
+            result = self._cached_call(
+                "search",
+                payload,
+                fetch,
+                self.shared_search_ttl,
+                cache_if=lambda r: r["status"] == 200,
             )
 
-            if response.status_code != 200:
+            if result["status"] != 200:
                 try:
-                    error_msg = response.json().get("error", "Unknown error")
+                    error_msg = json.loads(result["text"]).get("error", "Unknown error")
                 except:
-                    error_msg = response.text
+                    error_msg = result["text"]
                 return f"❌ Search failed: {error_msg}"
 
-            # MCP endpoint returns plain text, not JSON
-            result_text = response.text
+            # JSON from the MCP handler (plain text is passed through)
+            result_text = result["text"]
+
+            # Fetch details for the top hits in the background
+            self._schedule_prefetch(portal, query, result_text)
+
+            # Render for the LLM, within the output budget
+            result_text = self._render_results(result_text)
             return result_text
 
-        except requests.Timeout:
-            return "⏱️ Request timed out. The portal may be slow or unavailable."
-        except requests.ConnectionError:
-            return "🔌 Connection error. Please check your internet connection."
         except Exception as e:
-            return f"❌ Error: {str(e)}"
+            return self._error_message(e)
 
 
 # Example usage (for testing):
@@ -0,0 +1,351 @@
+"""
+Shared cache for the Python tools (mfkn_search_tool, openwebui_tool)
+
+OpenWebUI deployments with several worker processes each hold their own
+Tools instance, so identical searches from different workers all hit the
+MCP server. This module gives them one cache on local disk:
+
+- SQLite database in WAL mode (readers never block the writer)
+- LRU eviction on last access, bounded by max_entries
+- TTL per entry
+- Single-flight across processes: concurrent identical requests take a
+  short lease; one caller talks to the MCP server, the others wait for
+  its result - including failures, which are kept for a few seconds so
+  an outage costs one upstream call per key, not one per worker
+
+Setup:
+1. Put this file next to the tool (or anywhere on the OpenWebUI PYTHONPATH)
+2. Set tool.shared_cache_path to a file all workers can reach, e.g.
+   "/app/backend/data/naevneneshus-cache.sqlite3"
+
+Without this file the tools work as before, each with its own memory.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS failures (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedCacheError(RuntimeError):
+    """
+    The single-flight owner's compute() failed; raised in every waiter.
+
+    The message is the owner's exception message, and error_types holds the
+    class names of its exception (e.g. ("ReadTimeout", "Timeout", ...)), so
+    callers can answer exactly as if they had made the call themselves.
+    """
+
+    def __init__(self, message: str, error_types: Tuple[str, ...] = ()):
+        super().__init__(message)
+        self.error_types = tuple(error_types)
+
+
+class SharedCacheTimeout(SharedCacheError):
+    """Gave up waiting for another worker's result."""
+
+    def __init__(self, message: str):
+        super().__init__(message, ("SharedCacheTimeout", "Timeout"))
+
+
+def make_key(namespace: str, params: Any) -> str:
+    """Stable key for any JSON-serialisable request description."""
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+class SharedCache:
+    """
+    Cross-process key/value cache backed by SQLite.
+
+    Args:
+        path: Database file shared by all workers
+        max_entries: LRU bound; the least recently used entries are evicted
+        lease_seconds: How long a single-flight owner may take before
+                       its lease expires and a waiter may take over
+        poll_interval: How often waiters check for the owner's result
+        failure_ttl: How long a failed or uncacheable result is shared
+                     with other callers before the next upstream attempt
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        lease_seconds: float = 35.0,
+        poll_interval: float = 0.05,
+        failure_ttl: float = 5.0,
+    ):
+        self.path = path
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        # Only refresh last_access if older than this - keeps reads cheap
+        self.touch_interval = 5.0
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "computed": 0, "waited": 0, "failures": 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    # ------------------------------------------------------------
+    # Connection handling (one per thread and process)
+    # ------------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    # ------------------------------------------------------------
+    # Basic get / set
+    # ------------------------------------------------------------
+    def get(self, key: str) -> Optional[Any]:
+        value = self._read(key)
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def _read(self, key: str) -> Optional[Any]:
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, expires_at, last_access FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None or row[1] < now:
+            return None
+
+        if now - row[2] > self.touch_interval:
+            self._conn().execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        raw = json.dumps(value, ensure_ascii=False)
+        namespace = key.split(":", 1)[0]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, namespace, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, raw, len(raw), now + ttl, now),
+            )
+            conn.execute("DELETE FROM failures WHERE key = ? OR expires_at < ?", (key, now))
+            # LRU: drop expired entries and anything beyond max_entries
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------
+    # Single-flight
+    # ------------------------------------------------------------
+    def _acquire_lease(self, key: str, owner: str) -> bool:
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            " owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ?",
+            (key, owner, now + self.lease_seconds, now),
+        )
+        return cur.rowcount == 1
+
+    def _release_lease(self, key: str, owner: str) -> None:
+        self._conn().execute(
+            "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+        )
+
+    def _lease_active(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT expires_at FROM leases WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None and row[0] >= time.time()
+
+    def _publish_failure(self, key: str, kind: str, payload: str) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO failures (key, kind, payload, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, kind, payload, time.time() + self.failure_ttl),
+        )
+
+    def _read_failure(self, key: str) -> Optional[tuple]:
+        row = self._conn().execute(
+            "SELECT kind, payload FROM failures WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _outcome(self, key: str) -> Optional[tuple]:
+        """("value", v) for a cached or shared uncacheable value, ("error", e) or None."""
+        value = self._read(key)
+        if value is not None:
+            return "value", value
+        failure = self._read_failure(key)
+        if failure is None:
+            return None
+        kind, payload = failure
+        if kind == "value":
+            return "value", json.loads(payload)
+        error = json.loads(payload)
+        return "error", SharedCacheError(error["message"], tuple(error["types"]))
+
+    def _resolve(self, outcome: tuple) -> Any:
+        kind, payload = outcome
+        if kind == "error":
+            self._count("failures")
+            raise payload
+        return payload
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, or compute it exactly once across
+        all processes sharing the database.
+
+        Values for which cache_if returns False (e.g. error responses) are
+        not cached for ttl, but are shared with waiting and new callers for
+        failure_ttl. If compute raises, the exception propagates in the
+        owner, and every other caller within failure_ttl gets a
+        SharedCacheError with its message and class names. A waiter never calls compute()
+        without holding the lease; if no result arrives within
+        lease_seconds it raises SharedCacheTimeout.
+        """
+        outcome = self._outcome(key)
+        if outcome is not None:
+            self._count("hits" if outcome[0] == "value" else "misses")
+            return self._resolve(outcome)
+        self._count("misses")
+
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self.lease_seconds
+        while True:
+            if self._acquire_lease(key, owner):
+                try:
+                    # Another worker may have finished just before we got the lease
+                    outcome = self._outcome(key)
+                    if outcome is not None:
+                        return self._resolve(outcome)
+                    try:
+                        value = compute()
+                    except Exception as e:
+                        error = {
+                            "types": [cls.__name__ for cls in type(e).__mro__],
+                            "message": str(e),
+                        }
+                        self._publish_failure(key, "error", json.dumps(error))
+                        raise
+                    finally:
+                        self._count("computed")
+                    if cache_if is None or cache_if(value):
+                        self.set(key, value, ttl)
+                    else:
+                        self._publish_failure(
+                            key, "value", json.dumps(value, ensure_ascii=False)
+                        )
+                    return value
+                finally:
+                    self._release_lease(key, owner)
+
+            # Someone else is fetching - wait for their result (or failure)
+            self._count("waited")
+            while self._lease_active(key):
+                if time.time() >= deadline:
+                    raise SharedCacheTimeout(
+                        f"No result for {key} within {self.lease_seconds:g}s"
+                    )
+                time.sleep(self.poll_interval)
+                outcome = self._outcome(key)
+                if outcome is not None:
+                    return self._resolve(outcome)
+
+            outcome = self._outcome(key)
+            if outcome is not None:
+                return self._resolve(outcome)
+            if time.time() >= deadline:
+                raise SharedCacheTimeout(
+                    f"No result for {key} within {self.lease_seconds:g}s"
+                )
+            # Owner's lease expired without a result (process died) - take over
+
+    # ------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._conn().execute("DELETE FROM entries")
+            self._conn().execute("DELETE FROM failures")
+        else:
+            self._conn().execute(
+                "DELETE FROM entries WHERE namespace = ?", (namespace,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-process hit/miss counters plus shared size of the database."""
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = row[0]
+        stats["bytes"] = row[1]
+        stats["max_entries"] = self.max_entries
+        return stats